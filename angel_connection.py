@@ -4,15 +4,40 @@ import pyotp
 import os
 import json
 import requests
-import http.client  # Added for comprehensive market data fetching
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 from dotenv import load_dotenv
 import pandas as pd
+import numpy as np
 
 # Load environment variables from .env file
 load_dotenv()
 
+# Per-token quote requests are I/O bound, so they are issued concurrently
+MARKET_DATA_FETCH_WORKERS = 8
+_market_data_pool = ThreadPoolExecutor(max_workers=MARKET_DATA_FETCH_WORKERS, thread_name_prefix='angel-quote')
+
+# Text Angel One returns (as a message or in the raised error) when the
+# per-second request quota is exhausted
+RATE_LIMIT_MARKER = 'exceeding access rate'
+
+# Keep-alive connection pool shared by every request to Angel One
+ANGEL_ONE_BASE_URL = "https://apiconnect.angelone.in"
+HTTP_POOL_CONNECTIONS = 16
+HTTP_POOL_MAXSIZE = 32
+
+def _build_http_session():
+    """requests.Session with a pooled adapter and a short retry budget"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE,
+                          max_retries=Retry(total=2, backoff_factor=0.1))
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
 class AngelOneConnection:
     """Angel One SmartAPI connection using the working method"""
     
@@ -23,6 +48,8 @@ class AngelOneConnection:
         self.refresh_token = None
         self.feed_token = None
         self.user_profile = None
+        self.rate_limited = False  # set by the last historical data request
+        self.session = _build_http_session()
         
     def initialize_smartapi(self):
         """Initialize SmartAPI connection with credentials from .env file"""
@@ -39,7 +66,8 @@ class AngelOneConnection:
                 return False
             
             # Initialize SmartAPI
-            self.smart_api = SmartConnect(api_key)
+            self.smart_api = SmartConnect(api_key, pool={'pool_connections': HTTP_POOL_CONNECTIONS,
+                                                         'pool_maxsize': HTTP_POOL_MAXSIZE})
             
             # Generate TOTP
             totp = pyotp.TOTP(totp_secret).now()
@@ -133,14 +161,17 @@ class AngelOneConnection:
             from_date_formatted = from_date.strftime('%Y-%m-%d %H:%M')
             to_date_formatted = to_date.strftime('%Y-%m-%d %H:%M')
             
-            return self.smart_api.getCandleData({
+            data = self.smart_api.getCandleData({
                 "exchange": exchange,
                 "symboltoken": symbol,
                 "interval": interval,
                 "fromdate": from_date_formatted,
                 "todate": to_date_formatted
             })
+            self.rate_limited = isinstance(data, dict) and RATE_LIMIT_MARKER in str(data.get('message', '')).lower()
+            return data
         except Exception as e:
+            self.rate_limited = RATE_LIMIT_MARKER in str(e).lower()
             logger.error(f"Error getting historical data: {e}")
             return None
     
@@ -406,12 +437,9 @@ class AngelOneConnection:
             }
             
             # Make login request
-            conn = http.client.HTTPSConnection("apiconnect.angelone.in")
-            conn.request("POST", "/rest/auth/angelbroking/user/v1/loginByPassword", 
-                        json.dumps(payload), headers)
-            
-            response = conn.getresponse()
-            data = json.loads(response.read().decode())
+            response = self.session.post(f"{ANGEL_ONE_BASE_URL}/rest/auth/angelbroking/user/v1/loginByPassword",
+                                         data=json.dumps(payload), headers=headers)
+            data = response.json()
             
             if data.get('status') and data.get('data'):
                 access_token = data['data']['jwtToken']
@@ -454,37 +482,11 @@ class AngelOneConnection:
                 }
             }
             
-            for token in all_tokens:
-                try:
-                    # Get comprehensive data for each symbol
-                    # First get basic quote data
-                    quote_data = self.smart_api.getMarketData("NSE", token)
-                    
-                    if quote_data and quote_data.get('data'):
-                        data = quote_data['data']
-                        
-                        # Create comprehensive token data similar to direct API format
-                        token_data = {
-                            'symboltoken': token,
-                            'tradingSymbol': data.get('tradingsymbol', f'TOKEN_{token}'),
-                            'exchange': 'NSE',
-                            'ltp': float(data.get('ltp', 0)),
-                            'netChange': float(data.get('netChange', 0)),
-                            'percentChange': float(data.get('percentChange', 0)),
-                            'open': float(data.get('open', 0)),
-                            'high': float(data.get('high', 0)),
-                            'low': float(data.get('low', 0)),
-                            'close': float(data.get('close', 0)),
-                            'tradeVolume': int(data.get('volume', 0)),
-                            '52WeekHigh': float(data.get('52WeekHigh', 0)),
-                            '52WeekLow': float(data.get('52WeekLow', 0))
-                        }
-                        
-                        market_data['data']['fetched'].append(token_data)
-                        logger.info(f"Fetched data for token {token}: {token_data['tradingSymbol']}")
-                        
-                except Exception as e:
-                    logger.warning(f"Failed to fetch data for token {token}: {e}")
+            # Fetch all tokens concurrently; map keeps the request order
+            for token, token_data in zip(all_tokens, _market_data_pool.map(self._fetch_token_data, all_tokens)):
+                if token_data is not None:
+                    market_data['data']['fetched'].append(token_data)
+                else:
                     market_data['data']['unfetched'].append(token)
             
             logger.info(f"Successfully fetched comprehensive data for {len(market_data['data']['fetched'])} symbols")
@@ -494,6 +496,39 @@ class AngelOneConnection:
             logger.error(f"Market data fetch error: {e}")
             return None
 
+    def _fetch_token_data(self, token):
+        """Fetch one NSE token's quote in the comprehensive token_data format, or None on failure"""
+        try:
+            # Get comprehensive data for each symbol
+            # First get basic quote data
+            quote_data = self.smart_api.getMarketData("NSE", token)
+            
+            if quote_data and quote_data.get('data'):
+                data = quote_data['data']
+                
+                # Create comprehensive token data similar to direct API format
+                token_data = {
+                    'symboltoken': token,
+                    'tradingSymbol': data.get('tradingsymbol', f'TOKEN_{token}'),
+                    'exchange': 'NSE',
+                    'ltp': float(data.get('ltp', 0)),
+                    'netChange': float(data.get('netChange', 0)),
+                    'percentChange': float(data.get('percentChange', 0)),
+                    'open': float(data.get('open', 0)),
+                    'high': float(data.get('high', 0)),
+                    'low': float(data.get('low', 0)),
+                    'close': float(data.get('close', 0)),
+                    'tradeVolume': int(data.get('volume', 0)),
+                    '52WeekHigh': float(data.get('52WeekHigh', 0)),
+                    '52WeekLow': float(data.get('52WeekLow', 0))
+                }
+                logger.info(f"Fetched data for token {token}: {token_data['tradingSymbol']}")
+                return token_data
+                
+        except Exception as e:
+            logger.warning(f"Failed to fetch data for token {token}: {e}")
+            return None
+
     def fetch_multiple_symbols_data(self, symbol_list):
         """
         Fetch market data for multiple symbols using comprehensive approach
@@ -610,6 +645,64 @@ class AngelOneConnection:
                 'timestamp': datetime.now().isoformat()
             }
 
+    # Source fields read by generate_enhanced_signals, keyed by output name
+    ENHANCED_SIGNAL_FIELDS = {
+        'ltp': 'ltp', 'open': 'open', 'high': 'high', 'low': 'low',
+        'volume': 'tradeVolume', 'change_percent': 'percentChange',
+        '52w_high': '52WeekHigh', '52w_low': '52WeekLow'
+    }
+
+    def generate_enhanced_signals(self, token_rows: List[Dict]) -> pd.DataFrame:
+        """Vectorized generate_enhanced_signal for many tokens at once.
+
+        Returns one row per token with the same metrics as
+        generate_enhanced_signal plus the symboltoken. Missing or
+        non-numeric fields count as 0, which yields a HOLD signal.
+        """
+        frame = pd.DataFrame(token_rows, columns=['symboltoken', *self.ENHANCED_SIGNAL_FIELDS.values()])
+        values = {
+            name: pd.to_numeric(frame[field], errors='coerce').fillna(0).to_numpy(dtype=np.float64)
+            for name, field in self.ENHANCED_SIGNAL_FIELDS.items()
+        }
+        ltp, open_price = values['ltp'], values['open']
+        change_percent = values['change_percent']
+        week_52_range = values['52w_high'] - values['52w_low']
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            volume_score = np.minimum(values['volume'] / 1000000, 1.0)
+            volatility_score = np.where(ltp > 0, (values['high'] - values['low']) / ltp, 0.0)
+            trend_strength = np.abs(change_percent) / 100
+            momentum_score = np.where(open_price > 0, (ltp - open_price) / open_price, 0.0)
+            position_in_range = np.where(week_52_range > 0, (ltp - values['52w_low']) / week_52_range, 0.5)
+
+        # Same thresholds as generate_enhanced_signal
+        qualifies = (volume_score > 1.5) & (volatility_score < 0.02) & (trend_strength > 0.6)
+        buy = qualifies & (change_percent > 2.5)
+        sell = qualifies & (change_percent < -2.5)
+        confidence = np.where(
+            buy | sell,
+            np.minimum(0.8 + (np.abs(change_percent) - 2.5) * 0.05 + volume_score * 0.15, 0.95),
+            0.0
+        )
+        # Reduce confidence for extreme positions in the 52-week range
+        confidence = np.where((position_in_range < 0.2) | (position_in_range > 0.8), confidence * 0.8, confidence)
+
+        return pd.DataFrame({
+            'symboltoken': frame['symboltoken'],
+            'signal': np.where(buy, 'BUY', np.where(sell, 'SELL', 'HOLD')),
+            'confidence': confidence,
+            'entry_price': ltp,
+            'volume_score': volume_score,
+            'volatility_score': volatility_score,
+            'trend_strength': trend_strength,
+            'momentum_score': momentum_score,
+            'position_in_52w_range': position_in_range,
+            'change_percent': change_percent,
+            'volume': values['volume'].astype(np.int64),
+            '52w_high': values['52w_high'],
+            '52w_low': values['52w_low']
+        })
+
 # Global instance
 angel_one_client = AngelOneConnection()
 
@@ -2,21 +2,30 @@ import threading
 import time
 from datetime import datetime
 import logging
+import numpy as np
 from typing import Dict, List, Optional
 import sqlite3
 from trading_system import TradingSystem
 from risk_manager import RiskManager
 # from database_config import Database  # Commented out as it's not needed for basic functionality
-from symbols import get_all_symbols, get_working_symbols
+from symbols import get_all_symbols
 from angel_connection import angel_one_client
+from indian_trading_system import IST, NSE_OPEN_TIME, NSE_CLOSE_TIME
 
 logger = logging.getLogger(__name__)
 
+# Daily bars used for a symbol's volatility, and the value used without them
+VOLATILITY_WINDOW = 20
+DEFAULT_VOLATILITY = 0.02
+
 class AutoTrader:
     def __init__(self, trading_system: TradingSystem, risk_manager: RiskManager):
         self.trading_system = trading_system
         self.risk_manager = risk_manager
         self.active_trades = {}
+        # Guards adds/removes on active_trades; the trading loop works from
+        # one snapshot per pass (see _trades_snapshot)
+        self._trades_lock = threading.RLock()
         self.db_path = 'trading.db'
         self.running = False
         self.trading_thread = None
@@ -45,6 +54,8 @@ class AutoTrader:
             'FINNIFTY': '26037',
             'MIDCPNIFTY': '26017'
         }
+        # Reverse lookup for quotes, which identify symbols by token
+        self.token_to_symbol = {token: name for name, token in self.symbol_token_map.items()}
         
     def start(self):
         """Start the auto trading system"""
@@ -72,23 +83,15 @@ class AutoTrader:
     def _is_market_open(self) -> bool:
         """Check if market is currently open"""
         try:
-            from datetime import timezone
-            import pytz
-            
             # Get current IST time
-            ist = pytz.timezone('Asia/Kolkata')
-            now = datetime.now(ist)
+            now = datetime.now(IST)
             
             # Check if it's a weekday (Monday to Friday)
             if now.weekday() >= 5:  # Saturday = 5, Sunday = 6
                 return False
                 
             # Check market hours (9:15 AM to 3:30 PM IST)
-            current_time = now.time()
-            market_open = datetime.strptime('09:15', '%H:%M').time()
-            market_close = datetime.strptime('15:30', '%H:%M').time()
-            
-            return market_open <= current_time <= market_close
+            return NSE_OPEN_TIME <= now.time() <= NSE_CLOSE_TIME
             
         except Exception as e:
             logger.error(f"Error checking market hours: {str(e)}")
@@ -100,14 +103,17 @@ class AutoTrader:
             try:
                 # Check if market is open before processing trades
                 if self._is_market_open():
+                    # One snapshot of the active trades is shared by the passes below
+                    trades = self._trades_snapshot()
+
                     # Process each active trade
-                    self._process_active_trades()
+                    self._process_active_trades(trades)
 
                     # Automatically update positions (check exit conditions and adjust trailing stops)
-                    self._auto_update_positions()
+                    self._auto_update_positions(trades)
 
                     # Update trailing stops for active trades
-                    self._update_trailing_stops()
+                    self._update_trailing_stops(trades)
 
                     # Check for new trading opportunities using enhanced method
                     # Assuming a default user_id for automated trades for now
@@ -123,10 +129,15 @@ class AutoTrader:
                 logger.error(f'Error in trading loop: {str(e)}')
                 time.sleep(5)  # Sleep longer on error
                 
-    def _process_active_trades(self):
+    def _trades_snapshot(self) -> tuple:
+        """(trade_id, trade) pairs of the active trades at this moment"""
+        with self._trades_lock:
+            return tuple(self.active_trades.items())
+    
+    def _process_active_trades(self, trades: tuple):
         """Process all active trades"""
         try:
-            for trade_id, trade in list(self.active_trades.items()):
+            for trade_id, trade in trades:
                 # Get current price
                 current_price = self.risk_manager.get_current_price(trade['symbol'])
                 if not current_price:
@@ -146,10 +157,13 @@ class AutoTrader:
         except Exception as e:
             logger.error(f'Error processing active trades: {str(e)}')
             
-    def _auto_update_positions(self):
+    def _auto_update_positions(self, trades: tuple):
         """Automatically update positions based on market conditions"""
         try:
-            for trade_id, trade in list(self.active_trades.items()):
+            for trade_id, trade in trades:
+                if trade_id not in self.active_trades:
+                    continue  # Closed earlier in this pass
+                
                 # Update trailing stops
                 self._update_trailing_stop(trade_id, trade)
                 
@@ -159,11 +173,11 @@ class AutoTrader:
         except Exception as e:
             logger.error(f'Error updating positions: {str(e)}')
             
-    def _update_trailing_stops(self):
+    def _update_trailing_stops(self, trades: tuple):
         """Update trailing stops for all active trades"""
         try:
-            for trade_id, trade in list(self.active_trades.items()):
-                if 'trailing_stop' in trade:
+            for trade_id, trade in trades:
+                if 'trailing_stop' in trade and trade_id in self.active_trades:
                     self._update_trailing_stop(trade_id, trade)
                     
         except Exception as e:
@@ -225,16 +239,29 @@ class AutoTrader:
     def _check_trading_opportunities(self, user_id: int):
         """Check for new trading opportunities"""
         try:
-            # Get all available symbols (use working symbols to avoid errors)
-            symbols = get_working_symbols()
+            if not angel_one_client or not angel_one_client.is_connected:
+                logger.warning("Angel One not connected, skipping opportunity check")
+                return
             
             # Process only a few symbols at a time to avoid overwhelming the API
-            symbols_to_process = symbols[:5]  # Process only first 5 symbols
+            symbols_to_process = list(self.symbol_token_map)[:5]  # Process only first 5 symbols
+            
+            # One quote request for all symbols instead of a round trip per symbol
+            market_data = angel_one_client.fetch_market_data_direct({
+                "NSE": [self.symbol_token_map[symbol] for symbol in symbols_to_process]
+            })
             
-            for symbol in symbols_to_process:
+            if not market_data or not market_data.get('status'):
+                logger.warning("Failed to fetch market data for opportunity check")
+                return
+            
+            for token_data in market_data['data']['fetched']:
+                symbol = self._get_symbol_name_from_token(token_data.get('symboltoken'))
+                if not symbol:
+                    continue
                 try:
-                    # Analyze market for this symbol
-                    analysis = self.trading_system.analyze_market(symbol)
+                    # Analyze the fetched quote for this symbol
+                    analysis = angel_one_client.generate_enhanced_signal(token_data)
                     
                     if analysis['signal'] == 'BUY' and analysis['confidence'] > 0.7:
                         # Check if we can open a new position
@@ -245,9 +272,6 @@ class AutoTrader:
                         # Check if we can open a new position
                         if self._can_open_position(user_id, symbol):
                             self._open_automated_trade(user_id, symbol, 'SELL', analysis)
-                            
-                    # Add small delay between symbols to avoid rate limiting
-                    time.sleep(0.2)
                     
                 except Exception as e:
                     logger.error(f'Error analyzing {symbol}: {str(e)}')
@@ -266,10 +290,11 @@ class AutoTrader:
                 return False
                 
             # Check if we already have an active trade for this symbol
-            for trade in self.active_trades.values():
-                if trade['symbol'] == symbol and trade['user_id'] == user_id:
-                    logger.info(f"Already have active trade for {symbol}")
-                    return False
+            with self._trades_lock:
+                for trade in self.active_trades.values():
+                    if trade['symbol'] == symbol and trade['user_id'] == user_id:
+                        logger.info(f"Already have active trade for {symbol}")
+                        return False
                     
             return True
             
@@ -317,7 +342,8 @@ class AutoTrader:
             trade_id = f"auto_{symbol}_{int(time.time())}"
             
             # Add to active trades
-            self.active_trades[trade_id] = trade
+            with self._trades_lock:
+                self.active_trades[trade_id] = trade
             
             # Log the trade
             logger.info(f"Opened automated {direction} trade for {symbol}: {trade_id}")
@@ -350,26 +376,34 @@ class AutoTrader:
                 return entry_price * 1.02, entry_price * 0.96
                 
     def _calculate_volatility(self, symbol: str) -> float:
-        """Calculate volatility for a symbol"""
+        """Daily volatility (std of log returns over VOLATILITY_WINDOW bars) for a symbol"""
         try:
-            # This is a simplified volatility calculation
-            # In a real application, you would use historical price data
-            return 0.02  # Default 2% volatility
+            # Daily candles are cached by the trading system
+            data = self.trading_system.get_historical_data(symbol)
+            if data is None or data.empty or 'Close' not in data:
+                return DEFAULT_VOLATILITY
+            
+            closes = data['Close'].to_numpy(dtype=np.float64)[-(VOLATILITY_WINDOW + 1):]
+            closes = closes[np.isfinite(closes) & (closes > 0)]
+            if closes.size < 3:
+                return DEFAULT_VOLATILITY
+            
+            # Not annualized: stops and max_volatility are fractions of one day's move
+            return float(np.diff(np.log(closes)).std(ddof=1))
             
         except Exception as e:
             logger.error(f'Error calculating volatility: {str(e)}')
-            return 0.02
+            return DEFAULT_VOLATILITY
             
     def close_trade(self, trade_id: str):
         """Close a trade"""
         try:
-            if trade_id in self.active_trades:
-                trade = self.active_trades[trade_id]
+            # Remove from active trades
+            with self._trades_lock:
+                trade = self.active_trades.pop(trade_id, None)
+            if trade is not None:
                 logger.info(f"Closing trade {trade_id} for {trade['symbol']}")
                 
-                # Remove from active trades
-                del self.active_trades[trade_id]
-                
                 # Here you would implement the actual trade closing logic
                 # This might involve calling the trading system to close the position
                 
@@ -378,7 +412,8 @@ class AutoTrader:
             
     def get_active_trades(self) -> Dict:
         """Get all active trades"""
-        return self.active_trades.copy()
+        with self._trades_lock:
+            return self.active_trades.copy()
         
     def get_trade_status(self, trade_id: str) -> Optional[Dict]:
         """Get status of a specific trade"""
@@ -439,10 +474,11 @@ class AutoTrader:
                 return False
             
             # Check if we already have an active trade for this symbol
-            for trade in self.active_trades.values():
-                if trade['symbol'] == symbol and trade['user_id'] == user_id:
-                    logger.info(f"Already have active trade for {symbol}")
-                    return False
+            with self._trades_lock:
+                for trade in self.active_trades.values():
+                    if trade['symbol'] == symbol and trade['user_id'] == user_id:
+                        logger.info(f"Already have active trade for {symbol}")
+                        return False
             
             # Enhanced checks
             
@@ -504,7 +540,8 @@ class AutoTrader:
             trade_id = f"enhanced_{symbol}_{int(time.time())}"
             
             # Add to active trades
-            self.active_trades[trade_id] = trade
+            with self._trades_lock:
+                self.active_trades[trade_id] = trade
             
             # Log the enhanced trade
             logger.info(f"Opened enhanced {direction} trade for {symbol}: {trade_id}")
@@ -552,19 +589,17 @@ class AutoTrader:
 
     def _get_symbol_name_from_token(self, token: str) -> Optional[str]:
         """Get symbol name from token"""
-        for name, token_value in self.symbol_token_map.items():
-            if token_value == token:
-                return name
-        return None
+        return self.token_to_symbol.get(token)
 
     def get_enhanced_trade_status(self) -> Dict:
         """Get enhanced trade status and performance metrics"""
         try:
-            total_trades = len(self.active_trades)
+            trades = self._trades_snapshot()
+            total_trades = len(trades)
             total_pnl = 0.0
             winning_trades = 0
             
-            for trade in self.active_trades.values():
+            for _, trade in trades:
                 # Calculate current P&L (simplified)
                 if 'signal_analysis' in trade:
                     current_price = trade['signal_analysis']['entry_price']  # Simplified
@@ -26,6 +26,7 @@ MAX_SOURCE_RETRIES = 2  # Maximum number of alternative sources to try
 # Cache Settings
 PRICE_CACHE_DURATION = 300  # 5 minutes - increased from 1 minute
 HISTORICAL_CACHE_DURATION = 3600  # 1 hour
+INTRADAY_CACHE_DURATION = 60  # 1 minute - intraday bars refresh every minute
 
 # Error Handling
 MAX_CONSECUTIVE_ERRORS = 3  # Maximum number of consecutive errors before switching source
@@ -9,9 +9,10 @@ import numpy as np
 import requests
 import json
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, time as dt_time
 from typing import Dict, List, Optional, Tuple
 import sqlite3
+import pytz
 import time
 import threading
 from dataclasses import dataclass
@@ -19,6 +20,12 @@ from angel_connection import angel_one_client, AngelOneConnection
 
 logger = logging.getLogger(__name__)
 
+# NSE trading session (9:15 AM to 3:30 PM IST, Monday to Friday), shared by
+# the app and the auto-traders
+IST = pytz.timezone('Asia/Kolkata')
+NSE_OPEN_TIME = dt_time(9, 15)
+NSE_CLOSE_TIME = dt_time(15, 30)
+
 @dataclass
 class IndianTradeSignal:
     """Indian market trade signal with enhanced analysis"""
@@ -89,8 +96,8 @@ class IndianTradingSystem:
         # Market timing for Indian markets (IST)
         self.market_hours = {
             'pre_market': '09:00',
-            'market_open': '09:15',
-            'market_close': '15:30',
+            'market_open': NSE_OPEN_TIME.strftime('%H:%M'),
+            'market_close': NSE_CLOSE_TIME.strftime('%H:%M'),
             'post_market': '15:45'
         }
         
@@ -98,6 +105,10 @@ class IndianTradingSystem:
         self.trade_history = []
         self.performance_metrics = {}
         
+        # Called with a user_id after this module writes that user's signals,
+        # trades or portfolio history (the app drops its cached dashboard)
+        self.on_user_data_changed = None
+        
     def is_market_open(self) -> bool:
         """Check if Indian market is currently open (IST)"""
         try:
@@ -110,22 +121,14 @@ class IndianTradingSystem:
             except Exception:
                 pass
             # Get current IST time
-            from datetime import timezone
-            import pytz
-            
-            ist = pytz.timezone('Asia/Kolkata')
-            now = datetime.now(ist)
+            now = datetime.now(IST)
             
             # Check if it's a weekday
             if now.weekday() >= 5:  # Saturday = 5, Sunday = 6
                 return False
                 
             # Check market hours
-            current_time = now.time()
-            market_open = datetime.strptime(self.market_hours['market_open'], '%H:%M').time()
-            market_close = datetime.strptime(self.market_hours['market_close'], '%H:%M').time()
-            
-            return market_open <= current_time <= market_close
+            return NSE_OPEN_TIME <= now.time() <= NSE_CLOSE_TIME
             
         except Exception as e:
             logger.error(f"Error checking market hours: {str(e)}")
@@ -159,6 +162,10 @@ class IndianTradingSystem:
             logger.error(f"Error fetching data for {symbol}: {str(e)}")
             return pd.DataFrame()
     
+    def is_rate_limited(self) -> bool:
+        """Whether the last Angel One data request was rejected for exceeding the access rate"""
+        return bool(getattr(self.data_provider, 'rate_limited', False))
+    
     def _generate_mock_data(self, symbol: str, interval: str = '1d', period: str = '1d') -> pd.DataFrame:
         """Generate mock data for testing when Angel One API is not available"""
         try:
@@ -1195,6 +1202,15 @@ class IndianTradingSystem:
         logger.info(f"Returning {len(signals)} signals")
         return signals
     
+    def notify_user_data_changed(self, user_id: int):
+        """Run the on_user_data_changed hook, if one is registered"""
+        if self.on_user_data_changed is None:
+            return
+        try:
+            self.on_user_data_changed(user_id)
+        except Exception as e:
+            logger.error(f"Error in user data change hook: {str(e)}")
+    
     def save_signal_to_db(self, signal: IndianTradeSignal, user_id: int):
         """Save trading signal to database"""
         try:
@@ -1213,6 +1229,7 @@ class IndianTradingSystem:
             
             conn.commit()
             conn.close()
+            self.notify_user_data_changed(user_id)
             logger.info(f"Signal saved for {signal.symbol}")
             
         except Exception as e:
@@ -1475,6 +1492,7 @@ class IndianAutoTrader:
                         pass
                     conn.commit()
                     conn.close()
+                    self.trading_system.notify_user_data_changed(self.user_id)
                 except Exception as db_err:
                     logger.error(f"Error updating portfolio/trades in DB: {db_err}")
 